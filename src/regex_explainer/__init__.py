@@ -1,3 +1,3 @@
-__all__ = ["explain_regex", "analyze_regex"]
+__all__ = ["explain_regex", "analyze_regex", "canonicalize_regex", "fingerprint_regex"]
 
-from .core import analyze_regex, explain_regex
+from .core import analyze_regex, canonicalize_regex, explain_regex, fingerprint_regex
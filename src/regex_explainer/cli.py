@@ -2,14 +2,29 @@ from __future__ import annotations
 
 import argparse
 import json
+import re
 import sys
 from importlib.metadata import PackageNotFoundError, version
 
-from .core import analyze_regex, explain_regex, format_explanation, format_warnings
+from .core import (
+    analyze_regex,
+    canonicalize_regex,
+    explain_regex,
+    fingerprint_regex,
+    format_explanation,
+    format_warnings,
+    rule_names,
+)
+from .corpus import MATCH_MODES, profile_corpus
+from .runtime import build_report
 
 
 def build_parser() -> argparse.ArgumentParser:
-    parser = argparse.ArgumentParser(description="Explain a regex pattern.")
+    parser = argparse.ArgumentParser(
+        description="Explain a regex pattern.",
+        epilog="Subcommands 'report' and 'profile' are recognized only as the first argument. "
+        "To explain a pattern spelled 'report' or 'profile', use: regex-explainer -- report",
+    )
     parser.add_argument(
         "pattern",
         nargs="?",
@@ -48,10 +63,165 @@ def build_parser() -> argparse.ArgumentParser:
         action="store_true",
         help="Exit with status 2 if any warnings are detected.",
     )
+    parser.add_argument(
+        "--fail-fast",
+        action="store_true",
+        help="Stop analysis at the first warning (implies --fail-on-warn).",
+    )
+    parser.add_argument(
+        "--rules",
+        help=f"Comma-separated warning rules to run (default: all of {','.join(rule_names())}).",
+    )
+    parser.add_argument(
+        "--skip-rules",
+        help="Comma-separated warning rules to skip.",
+    )
     parser.add_argument("--version", action="store_true", help="Print version and exit.")
     return parser
 
 
+def build_report_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="regex-explainer report",
+        description="Rank patterns recorded by regex_explainer.runtime, joined with warnings.",
+    )
+    parser.add_argument("dumps", nargs="+", help="One or more runtime dump files to merge.")
+    parser.add_argument(
+        "--format",
+        choices=("text", "json"),
+        default="text",
+        help="Output format (default: text).",
+    )
+    parser.add_argument(
+        "--top",
+        type=int,
+        default=20,
+        help="Show at most N patterns (default: 20; 0 shows all).",
+    )
+    return parser
+
+
+def _report_main(argv: list[str]) -> int:
+    parser = build_report_parser()
+    args = parser.parse_args(argv)
+
+    try:
+        rows = build_report(args.dumps)
+    except (OSError, ValueError, KeyError) as exc:
+        parser.error(f"could not read runtime dump: {exc}")
+    if args.top > 0:
+        rows = rows[: args.top]
+
+    if args.format == "json":
+        print(json.dumps({"patterns": rows}, indent=2, sort_keys=True))
+        return 0
+
+    if not rows:
+        print("- No patterns recorded")
+        return 0
+    for row in rows:
+        seconds = row["estimated_compile_seconds"] + row["estimated_match_seconds"]
+        kind = " (bytes)" if row["type"] == "bytes" else ""
+        print(f"Pattern: /{row['pattern']}/{row['flags']}{kind}")
+        print(f"  calls: {row['total_calls']}  estimated time: {seconds:.6f}s")
+        if row["precompiled"]:
+            print("  note: compiled with re.compile; calls on the compiled object are not recorded")
+        for site in row["call_sites"][:3]:
+            print(f"  site: {site['site']} ({site['sampled_calls']} sampled)")
+        for warning in row["warnings"]:
+            print(f"  - [{warning['code']}] {warning['message']}")
+    return 0
+
+
+def _parse_rule_list(
+    parser: argparse.ArgumentParser, option: str, value: str | None
+) -> list[str] | None:
+    if value is None:
+        return None
+    names = [name.strip() for name in value.split(",") if name.strip()]
+    unknown = [name for name in names if name not in rule_names()]
+    if unknown:
+        parser.error(f"{option}: unknown rule(s): {', '.join(unknown)}")
+    return names
+
+
+def _positive_int(value: str) -> int:
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid int value: {value!r}") from None
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {number}")
+    return number
+
+
+def build_profile_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="regex-explainer profile",
+        description="Measure a pattern against every line of a corpus file.",
+    )
+    parser.add_argument("pattern", help="Regex pattern to profile (Python syntax).")
+    parser.add_argument("--corpus", required=True, help="Log or sample file, one input per line.")
+    parser.add_argument(
+        "--mode",
+        choices=MATCH_MODES,
+        default="search",
+        help="How each line is matched (default: search).",
+    )
+    parser.add_argument(
+        "--workers",
+        type=_positive_int,
+        default=None,
+        help="Worker processes (default: CPU count; 1 runs inline).",
+    )
+    parser.add_argument(
+        "--top",
+        type=int,
+        default=10,
+        help="Report the N slowest lines (default: 10).",
+    )
+    parser.add_argument(
+        "--format",
+        choices=("text", "json"),
+        default="json",
+        help="Output format (default: json).",
+    )
+    return parser
+
+
+def _profile_main(argv: list[str]) -> int:
+    parser = build_profile_parser()
+    args = parser.parse_args(argv)
+
+    try:
+        result = profile_corpus(
+            args.pattern, args.corpus, mode=args.mode, workers=args.workers, top=args.top
+        )
+    except re.error as exc:
+        parser.error(f"invalid pattern: {exc}")
+    except OSError as exc:
+        parser.error(f"could not read corpus: {exc}")
+
+    if args.format == "json":
+        print(json.dumps(result, indent=2, sort_keys=True))
+        return 0
+
+    print(f"Pattern: /{result['pattern']}/")
+    print(f"  lines: {result['lines']}  matches: {result['matches']} ({result['match_rate']:.1%})")
+    print(
+        f"  regex throughput: {result['throughput_mb_s']:.2f} MB/s "
+        f"(wall: {result['wall_throughput_mb_s']:.2f} MB/s)"
+    )
+    for bucket in result["histogram"]:
+        label = f"<= {bucket['upper_us']}us" if bucket["upper_us"] is not None else "slower"
+        print(f"  {label}: {bucket['count']}")
+    for slow in result["slowest"]:
+        print(f"  line {slow['line']}: {slow['seconds'] * 1e6:.1f}us {slow['text']}")
+    for warning in result["warnings"]:
+        print(f"  - [{warning['code']}] {warning['message']}")
+    return 0
+
+
 def _read_pattern_from_stdin() -> str:
     data = sys.stdin.read()
     if data.endswith("\n"):
@@ -94,6 +264,13 @@ def _get_version() -> str:
 
 
 def main(argv: list[str] | None = None) -> int:
+    if argv is None:
+        argv = sys.argv[1:]
+    if argv and argv[0] == "report":
+        return _report_main(argv[1:])
+    if argv and argv[0] == "profile":
+        return _profile_main(argv[1:])
+
     parser = build_parser()
     args = parser.parse_args(argv)
 
@@ -108,6 +285,9 @@ def main(argv: list[str] | None = None) -> int:
 
     pattern = args.pattern
     flags = args.flags
+    rules = _parse_rule_list(parser, "--rules", args.rules)
+    skip_rules = _parse_rule_list(parser, "--skip-rules", args.skip_rules)
+    fail_on_warn = args.fail_on_warn or args.fail_fast
 
     if pattern == "-":
         pattern = _read_pattern_from_stdin()
@@ -121,11 +301,13 @@ def main(argv: list[str] | None = None) -> int:
             flags = literal_flags
 
     if args.warnings:
-        warnings = analyze_regex(pattern)
+        warnings = analyze_regex(pattern, rules, skip_rules, fail_fast=args.fail_fast)
         if args.format == "json":
             payload = {
                 "pattern": pattern,
                 "flags": flags,
+                "canonical": canonicalize_regex(pattern, flags),
+                "fingerprint": fingerprint_regex(pattern, flags),
                 "warnings": [{"code": w.code, "message": w.message} for w in warnings],
             }
             print(json.dumps(payload, indent=2, sort_keys=True))
@@ -134,23 +316,25 @@ def main(argv: list[str] | None = None) -> int:
                 print(format_warnings(warnings))
             else:
                 print("- No warnings detected")
-        if args.fail_on_warn and warnings:
+        if fail_on_warn and warnings:
             return 2
         return 0
 
     no_warnings = args.no_warnings or args.explain_only
     lines = explain_regex(pattern)
-    warnings = analyze_regex(pattern)
+    warnings = analyze_regex(pattern, rules, skip_rules, fail_fast=args.fail_fast)
 
     if args.format == "json":
         payload = {
             "pattern": pattern,
             "flags": flags,
+            "canonical": canonicalize_regex(pattern, flags),
+            "fingerprint": fingerprint_regex(pattern, flags),
             "explanation": lines,
             "warnings": [{"code": w.code, "message": w.message} for w in warnings],
         }
         print(json.dumps(payload, indent=2, sort_keys=True))
-        if args.fail_on_warn and warnings:
+        if fail_on_warn and warnings:
             return 2
         return 0
 
@@ -172,7 +356,7 @@ def main(argv: list[str] | None = None) -> int:
         elif not args.quiet:
             print("- No warnings detected")
 
-    if args.fail_on_warn and warnings:
+    if fail_on_warn and warnings:
         return 2
     return 0
 
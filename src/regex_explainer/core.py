@@ -1,8 +1,9 @@
 from __future__ import annotations
 
+import hashlib
 import re
 from dataclasses import dataclass
-from typing import Iterable, List, Optional
+from typing import Callable, Dict, FrozenSet, Iterable, Iterator, List, Optional
 
 
 @dataclass(frozen=True)
@@ -18,6 +19,52 @@ class Warning:
     message: str
 
 
+@dataclass(frozen=True)
+class RuleNode:
+    # `kind` is a token kind ("literal", "escape", "class", "meta"), "group" for a
+    # closed group spanning tokens[start..end], or "pattern" for the whole pattern.
+    kind: str
+    start: int
+    end: int
+
+
+@dataclass(frozen=True)
+class RuleContext:
+    pattern: str
+    tokens: List[Token]
+
+
+@dataclass(frozen=True)
+class Rule:
+    name: str
+    kinds: FrozenSet[str]
+    check: Callable[[RuleContext, RuleNode], Optional[Warning]]
+
+
+@dataclass(frozen=True)
+class _Unit:
+    # One rendered atom of a canonical pattern (including its quantifier, if any).
+    text: str
+    quantified: bool = False
+    repeatable: bool = True
+
+
+# Python-style: `(?im)` / `(?im-sx)` at the very beginning.
+_LEADING_INLINE_FLAGS = re.compile(r"^\(\?([aiLmsux]+)(?:-([aiLmsux]+))?\)")
+
+# An inline flags group that turns on verbose mode, e.g. `(?x)`, `(?ix:`.
+_VERBOSE_FLAG = re.compile(r"\(\?[aiLmsu]*x")
+
+# Registered warning rules, in output order.
+_RULES: Dict[str, Rule] = {}
+
+# Classes that match any character; both member orders, since canonical forms sort them.
+_WIDE_CLASSES = frozenset({r"[\s\S]", r"[\S\s]", r"[\d\D]", r"[\D\d]", r"[\w\W]", r"[\W\w]"})
+
+# Class bodies (after sorting their members) that have a shorthand escape.
+_CLASS_SHORTHANDS = {"0-9": r"\d", "0-9A-Z_a-z": r"\w"}
+
+
 def tokenize(pattern: str) -> List[Token]:
     tokens: List[Token] = []
     i = 0
@@ -109,23 +156,91 @@ def explain_regex(pattern: str) -> List[str]:
     return lines
 
 
-def analyze_regex(pattern: str) -> List[Warning]:
-    warnings: List[Warning] = []
+def analyze_regex(
+    pattern: str,
+    rules: Optional[Iterable[str]] = None,
+    skip_rules: Optional[Iterable[str]] = None,
+    fail_fast: bool = False,
+) -> List[Warning]:
+    """Run the enabled warning rules over the pattern in a single traversal.
+
+    Each rule reports at most one warning and is not visited again once it fires.
+    With `fail_fast`, analysis stops at the first warning from any rule.
+    """
+    active = _select_rules(rules, skip_rules)
+    context = RuleContext(pattern, tokenize(pattern))
+
+    by_kind: Dict[str, List[Rule]] = {}
+    for rule in active:
+        for kind in rule.kinds:
+            by_kind.setdefault(kind, []).append(rule)
+
+    found: Dict[str, Warning] = {}
+    for node in _walk_rule_nodes(context.tokens):
+        interested = by_kind.get(node.kind)
+        if not interested:
+            continue
+        for rule in list(interested):
+            warning = rule.check(context, node)
+            if warning is None:
+                continue
+            if fail_fast:
+                return [warning]
+            found[rule.name] = warning
+            for kind in rule.kinds:
+                by_kind[kind].remove(rule)
+        if len(found) == len(active):
+            break
+
+    return [found[rule.name] for rule in active if rule.name in found]
+
+
+def register_rule(rule: Rule) -> None:
+    if rule.name in _RULES:
+        raise ValueError(f"rule already registered: {rule.name}")
+    _RULES[rule.name] = rule
+
+
+def rule_names() -> List[str]:
+    return list(_RULES)
+
+
+def canonicalize_regex(pattern: str, flags: str = "") -> str:
+    """Rewrite cosmetic variants of a pattern into a single canonical spelling.
 
-    anchor_check_pattern = _strip_leading_inline_flags(pattern)
-    if not anchor_check_pattern.startswith("^"):
-        warnings.append(Warning("missing_start_anchor", "Regex does not start with ^ anchor."))
-    if not anchor_check_pattern.endswith("$"):
-        warnings.append(Warning("missing_end_anchor", "Regex does not end with $ anchor."))
+    Leading inline flags are sorted, redundant non-capturing groups are dropped,
+    class members are sorted and deduplicated, `[0-9]`-style classes become their
+    shorthand escape and `(?<name>` becomes `(?P<name>`. The result is meant for
+    deduplication and analysis; it treats `[0-9]` and `\\d` as the same even though
+    they differ on non-ASCII digits. Verbose patterns (`(?x)`) are returned as-is,
+    since whitespace there is insignificant and unwrapping groups could join tokens.
+    """
+    if "x" in flags or _VERBOSE_FLAG.search(pattern):
+        return pattern
+    flags, body = _canonical_leading_flags(pattern)
+    tokens = tokenize(body)
+    pieces: List[str] = []
+    i = 0
+    while i < len(tokens):
+        units, i, _ = _canonical_sequence(tokens, i)
+        pieces.extend(unit.text for unit in units)
+        if i < len(tokens):
+            # Unbalanced `)` is kept verbatim so the canonical form stays faithful.
+            pieces.append(tokens[i].value + (tokens[i].quantifier or ""))
+            i += 1
+    return flags + "".join(pieces)
 
-    for warning in _analyze_wildcards(pattern):
-        warnings.append(warning)
 
-    nested = _analyze_nested_quantifiers(pattern)
-    if nested is not None:
-        warnings.append(nested)
+def fingerprint_regex(pattern: str, flags: str = "") -> str:
+    """Stable structural hash of a pattern, shared by all of its cosmetic variants.
 
-    return warnings
+    `flags` (e.g. the `im` of `/abc/im`) are part of the hash, in normalized order.
+    """
+    canonical = canonicalize_regex(pattern, flags)
+    normalized = "".join(sorted(set(flags)))
+    if normalized:
+        canonical = f"{canonical}\0{normalized}"
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:16]
 
 
 def _explain_token(token: Token) -> str:
@@ -185,9 +300,8 @@ def _can_be_quantified(token: Token) -> bool:
 
 
 def _strip_leading_inline_flags(pattern: str) -> str:
-    # Python-style: `(?im)` / `(?im-sx)` at the very beginning.
     # This intentionally does not try to interpret scoped flags like `(?im:...)`.
-    match = re.match(r"^\(\?[aiLmsux]+(?:-[aiLmsux]+)?\)", pattern)
+    match = _LEADING_INLINE_FLAGS.match(pattern)
     if match is None:
         return pattern
     return pattern[match.end() :]
@@ -215,43 +329,58 @@ def _is_lazy_quantifier(quantifier: str) -> bool:
     return quantifier.endswith("?")
 
 
-def _analyze_wildcards(pattern: str) -> List[Warning]:
-    tokens = tokenize(pattern)
-    warnings: List[Warning] = []
+def _select_rules(
+    rules: Optional[Iterable[str]], skip_rules: Optional[Iterable[str]]
+) -> List[Rule]:
+    wanted = set(_RULES) if rules is None else set(rules)
+    skipped = set(skip_rules or ())
+    unknown = sorted((wanted | skipped) - set(_RULES))
+    if unknown:
+        raise ValueError(f"unknown rule(s): {', '.join(unknown)}")
+    return [rule for name, rule in _RULES.items() if name in wanted and name not in skipped]
 
-    for token in tokens:
-        if token.quantifier is None:
-            continue
-        if _is_lazy_quantifier(token.quantifier):
-            continue
 
-        if (
-            token.kind == "meta"
-            and token.value == "."
-            and _is_unbounded_quantifier(token.quantifier)
-        ):
-            warnings.append(
-                Warning(
-                    "greedy_dot",
-                    "Found greedy unbounded wildcard (e.g. `.*` / `.+`) which can be overly permissive and backtracking-prone.",
-                )
-            )
-            break
+def _walk_rule_nodes(tokens: List[Token]) -> Iterator[RuleNode]:
+    yield RuleNode("pattern", 0, len(tokens) - 1)
+    group_stack: List[int] = []
+    for idx, token in enumerate(tokens):
+        yield RuleNode(token.kind, idx, idx)
+        if token.kind == "meta" and token.value == "(":
+            group_stack.append(idx)
+        elif token.kind == "meta" and token.value == ")" and group_stack:
+            yield RuleNode("group", group_stack.pop(), idx)
 
-        if (
-            token.kind == "class"
-            and token.value in {r"[\s\S]", r"[\d\D]", r"[\w\W]"}
-            and _is_unbounded_quantifier(token.quantifier)
-        ):
-            warnings.append(
-                Warning(
-                    "greedy_wide_class",
-                    "Found greedy unbounded wide character class (e.g. `[\\s\\S]*`) which behaves like `.*` and can be overly permissive.",
-                )
-            )
-            break
 
-    return warnings
+def _check_start_anchor(context: RuleContext, node: RuleNode) -> Optional[Warning]:
+    if _strip_leading_inline_flags(context.pattern).startswith("^"):
+        return None
+    return Warning("missing_start_anchor", "Regex does not start with ^ anchor.")
+
+
+def _check_end_anchor(context: RuleContext, node: RuleNode) -> Optional[Warning]:
+    if _strip_leading_inline_flags(context.pattern).endswith("$"):
+        return None
+    return Warning("missing_end_anchor", "Regex does not end with $ anchor.")
+
+
+def _check_wildcard(context: RuleContext, node: RuleNode) -> Optional[Warning]:
+    token = context.tokens[node.start]
+    if token.quantifier is None or _is_lazy_quantifier(token.quantifier):
+        return None
+    if not _is_unbounded_quantifier(token.quantifier):
+        return None
+
+    if token.kind == "meta" and token.value == ".":
+        return Warning(
+            "greedy_dot",
+            "Found greedy unbounded wildcard (e.g. `.*` / `.+`) which can be overly permissive and backtracking-prone.",
+        )
+    if token.kind == "class" and token.value in _WIDE_CLASSES:
+        return Warning(
+            "greedy_wide_class",
+            "Found greedy unbounded wide character class (e.g. `[\\s\\S]*`) which behaves like `.*` and can be overly permissive.",
+        )
+    return None
 
 
 def _quantifier_repeats_group(quantifier: str) -> bool:
@@ -283,37 +412,32 @@ def _quantifier_repeats_group(quantifier: str) -> bool:
     return False
 
 
-def _analyze_nested_quantifiers(pattern: str) -> Warning | None:
-    tokens = tokenize(pattern)
-    group_stack: List[int] = []
+def _check_nested_quantifier(context: RuleContext, node: RuleNode) -> Optional[Warning]:
+    group_quantifier = context.tokens[node.end].quantifier
+    if group_quantifier is None or not _quantifier_repeats_group(group_quantifier):
+        return None
 
-    for idx, token in enumerate(tokens):
-        if token.kind == "meta" and token.value == "(":
-            group_stack.append(idx)
-            continue
-        if token.kind == "meta" and token.value == ")":
-            if not group_stack:
-                continue
-            start = group_stack.pop()
-            group_quantifier = token.quantifier
-            if group_quantifier is None or not _quantifier_repeats_group(group_quantifier):
-                continue
+    inner = context.tokens[node.start + 1 : node.end]
+    has_inner_quantifier = any(t.quantifier is not None for t in inner)
+    has_alternation = any(t.kind == "meta" and t.value == "|" for t in inner)
+    if not (has_inner_quantifier or has_alternation):
+        return None
+    details = []
+    if has_inner_quantifier:
+        details.append("inner quantifier")
+    if has_alternation:
+        details.append("alternation")
+    detail_str = " and ".join(details)
+    return Warning(
+        "nested_quantifier",
+        f"Possible catastrophic backtracking: a repeated group contains {detail_str}.",
+    )
 
-            inner = tokens[start + 1 : idx]
-            has_inner_quantifier = any(t.quantifier is not None for t in inner)
-            has_alternation = any(t.kind == "meta" and t.value == "|" for t in inner)
-            if has_inner_quantifier or has_alternation:
-                details = []
-                if has_inner_quantifier:
-                    details.append("inner quantifier")
-                if has_alternation:
-                    details.append("alternation")
-                detail_str = " and ".join(details)
-                return Warning(
-                    "nested_quantifier",
-                    f"Possible catastrophic backtracking: a repeated group contains {detail_str}.",
-                )
-    return None
+
+register_rule(Rule("start_anchor", frozenset({"pattern"}), _check_start_anchor))
+register_rule(Rule("end_anchor", frozenset({"pattern"}), _check_end_anchor))
+register_rule(Rule("wildcards", frozenset({"meta", "class"}), _check_wildcard))
+register_rule(Rule("nested_quantifiers", frozenset({"group"}), _check_nested_quantifier))
 
 
 def _describe_escape(value: str) -> str:
@@ -417,3 +541,203 @@ def _parse_group_name(tokens: List[Token], start: int) -> tuple[str, int] | None
         name_chars.append(value)
         i += 1
     return None
+
+
+def _canonical_flags(on: str, off: str) -> str:
+    on = "".join(sorted(set(on)))
+    off = "".join(sorted(set(off)))
+    return f"{on}-{off}" if off else on
+
+
+def _canonical_leading_flags(pattern: str) -> tuple[str, str]:
+    match = _LEADING_INLINE_FLAGS.match(pattern)
+    if match is None:
+        return "", pattern
+    flags = _canonical_flags(match.group(1), match.group(2) or "")
+    return f"(?{flags})", pattern[match.end() :]
+
+
+def _canonical_sequence(tokens: List[Token], start: int) -> tuple[List[_Unit], int, bool]:
+    # Renders tokens up to (not including) the `)` closing the current group.
+    # Returns (units, index_of_closing_paren_or_len, has_top_level_alternation).
+    units: List[_Unit] = []
+    has_alternation = False
+    # True while the last boundary was created by unwrapping a group.
+    spliced = False
+    i = start
+    while i < len(tokens):
+        token = tokens[i]
+        if token.kind == "meta" and token.value == ")":
+            break
+        if token.kind == "meta" and token.value == "(":
+            group_units, i, unwrapped = _canonical_group(tokens, i)
+            if (unwrapped or spliced) and group_units:
+                group_units[0] = _guard_escape_boundary(units, group_units[0])
+            units.extend(group_units)
+            spliced = unwrapped or (spliced and not group_units)
+            continue
+        if token.kind == "meta" and token.value == "|":
+            has_alternation = True
+            units.append(_Unit("|", repeatable=False))
+        else:
+            unit = _canonical_token(token)
+            units.append(_guard_escape_boundary(units, unit) if spliced else unit)
+        spliced = False
+        i += 1
+    return units, i, has_alternation
+
+
+def _canonical_group(tokens: List[Token], start: int) -> tuple[List[_Unit], int, bool]:
+    # Returns (units, next_index, unwrapped).
+    prefix, kind, i = _canonical_group_prefix(tokens, start)
+    if kind == "flags":
+        return [_Unit(prefix, repeatable=False)], i, False
+
+    content, end, has_alternation = _canonical_sequence(tokens, i)
+    body = "".join(unit.text for unit in content)
+    if end >= len(tokens):
+        # Unclosed group: keep what we have.
+        return [_Unit(prefix + body, repeatable=False)], end, False
+
+    quantifier = tokens[end].quantifier
+    if kind == "noncapture" and not has_alternation:
+        if quantifier is None:
+            return content, end + 1, True
+        if len(content) == 1 and not content[0].quantified and content[0].repeatable:
+            return [_Unit(content[0].text + quantifier, quantified=True)], end + 1, True
+
+    text = f"{prefix}{body}){quantifier or ''}"
+    return [_Unit(text, quantifier is not None, kind != "lookaround")], end + 1, False
+
+
+def _canonical_group_prefix(tokens: List[Token], start: int) -> tuple[str, str, int]:
+    # Returns (canonical_prefix, kind, index_after_prefix).
+    def bare(i: int) -> str | None:
+        # Prefix characters only count when nothing was attached to them as a quantifier.
+        if i >= len(tokens) or tokens[i].quantifier is not None:
+            return None
+        return tokens[i].value
+
+    if bare(start + 1) != "?" or tokens[start + 1].kind != "meta":
+        return "(", "capture", start + 1
+
+    third = bare(start + 2)
+    if third == ":":
+        return "(?:", "noncapture", start + 3
+    if third in {"=", "!"}:
+        return f"(?{third}", "lookaround", start + 3
+    if third == "<" and bare(start + 3) in {"=", "!"}:
+        return f"(?<{bare(start + 3)}", "lookaround", start + 4
+    if third == "P" and bare(start + 3) == "<":
+        parsed = _parse_group_name(tokens, start + 4)
+        if parsed is not None:
+            return f"(?P<{parsed[0]}>", "capture", parsed[1]
+    if third == "<":
+        parsed = _parse_group_name(tokens, start + 3)
+        if parsed is not None:
+            return f"(?P<{parsed[0]}>", "capture", parsed[1]
+
+    # Inline flags: `(?im)` applies globally, `(?im-s:...)` is a scoped group.
+    i = start + 2
+    flag_chars: List[str] = []
+    while i < len(tokens):
+        value = bare(i)
+        if value in {":", ")"}:
+            flags = "".join(flag_chars)
+            if not re.fullmatch(r"[aiLmsux]+(?:-[aiLmsux]+)?|-[aiLmsux]+", flags):
+                break
+            on, _, off = flags.partition("-")
+            canonical = _canonical_flags(on, off)
+            if value == ":":
+                return f"(?{canonical}:", "scoped", i + 1
+            return f"(?{canonical})", "flags", i + 1
+        if value is None or tokens[i].kind != "literal" or not re.fullmatch(r"[a-zA-Z-]", value):
+            break
+        flag_chars.append(value)
+        i += 1
+
+    # Anything else (`(?P=name)`, comments, conditionals) is rendered verbatim.
+    return "(?", "other", start + 2
+
+
+def _canonical_token(token: Token) -> _Unit:
+    text = token.value
+    if token.kind == "class":
+        text = _canonical_class(text)
+    zero_width = (token.kind == "meta" and text in {"^", "$"}) or (
+        token.kind == "escape" and text in {r"\b", r"\B", r"\A", r"\Z"}
+    )
+    if token.quantifier is not None:
+        return _Unit(text + token.quantifier, quantified=True, repeatable=not zero_width)
+    return _Unit(text, repeatable=not zero_width)
+
+
+def _canonical_class(value: str) -> str:
+    if len(value) < 3 or not value.endswith("]"):
+        return value
+    body = value[1:-1]
+    negated = body.startswith("^")
+    if negated:
+        body = body[1:]
+    # Nested sets and multi-character escapes (`\x41`, `\u0041`, octal) are left alone.
+    if body == "" or "[" in body or re.search(r"\\[xuUN0-9]", body):
+        return value
+
+    items: List[str] = []
+    i = 0
+    while i < len(body):
+        start = _parse_class_atom(body, i)
+        if start is None:
+            return value
+        first, i = start
+        if i + 1 < len(body) and body[i] == "-":
+            # `atom-atom` range; either end may be an escape such as `\t` or `\-`.
+            end = _parse_class_atom(body, i + 1)
+            if end is None or not (_is_range_end(first) and _is_range_end(end[0])):
+                return value
+            last, i = end
+            items.append(f"{_canonical_class_atom(first)}-{_canonical_class_atom(last)}")
+            continue
+        items.append(_canonical_class_atom(first))
+
+    members = sorted(set(items))
+    if len(members) == 1 and members[0] in {r"\d", r"\w", r"\s"}:
+        return members[0].swapcase() if negated else members[0]
+    joined = "".join(members)
+    shorthand = _CLASS_SHORTHANDS.get(joined)
+    if shorthand is not None:
+        return shorthand.swapcase() if negated else shorthand
+    return f"[{'^' if negated else ''}{joined}]"
+
+
+def _parse_class_atom(body: str, i: int) -> tuple[str, int] | None:
+    if body[i] != "\\":
+        return body[i], i + 1
+    if i + 1 >= len(body):
+        return None
+    return body[i : i + 2], i + 2
+
+
+def _is_range_end(atom: str) -> bool:
+    # Single characters only: `\d-z` is not a valid range.
+    return len(atom) == 1 or not atom[1].isalnum() or atom[1] in "abfnrtv"
+
+
+def _canonical_class_atom(atom: str) -> str:
+    # Escaped punctuation is spelled bare, except where the bare form is special in a class;
+    # bare `-` and `^` are escaped so that sorted members keep their meaning.
+    if len(atom) == 2 and not atom[1].isalnum() and atom[1] not in "\\]-^[":
+        return atom[1]
+    return {"-": r"\-", "^": r"\^"}.get(atom, atom)
+
+
+def _guard_escape_boundary(units: List[_Unit], nxt: _Unit) -> _Unit:
+    # Unwrapping can put a digit right after a numeric escape: `(a)(?:\1)0` must not
+    # become the backreference `\10`, nor `\01(?:2)` the octal escape `\012`.
+    if not units or not nxt.text[:1].isdigit():
+        return nxt
+    tail = "".join(unit.text for unit in units[-4:])
+    match = re.search(r"(\\+)\d+$", tail)
+    if match is None or len(match.group(1)) % 2 == 0:
+        return nxt
+    return _Unit(f"(?:{nxt.text})", nxt.quantified, nxt.repeatable)
@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+import bisect
+import heapq
+import mmap
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from .core import analyze_regex
+
+MATCH_MODES = ("search", "match", "fullmatch")
+
+# Upper bounds (inclusive, in microseconds) of the per-line latency histogram buckets.
+# A final overflow bucket collects everything slower.
+HISTOGRAM_BOUNDS_US = (1, 10, 100, 1_000, 10_000, 100_000)
+
+# Chunks handed to workers are at least this large, so tiny files stay in one chunk.
+MIN_CHUNK_BYTES = 1 << 20
+
+# Slow lines are reported truncated to this many characters.
+MAX_LINE_PREVIEW = 200
+
+
+@dataclass
+class _ChunkResult:
+    lines: int = 0
+    nbytes: int = 0
+    matches: int = 0
+    match_nanos: int = 0
+    histogram: List[int] = field(default_factory=lambda: [0] * (len(HISTOGRAM_BOUNDS_US) + 1))
+    # (nanoseconds, line index within the chunk, line preview)
+    slowest: List[Tuple[int, int, str]] = field(default_factory=list)
+
+
+def profile_corpus(
+    pattern: str,
+    path: str,
+    mode: str = "search",
+    workers: Optional[int] = None,
+    top: int = 10,
+) -> Dict[str, Any]:
+    """Time `pattern` against every line of the file at `path`.
+
+    The file is memory-mapped and split on line boundaries into chunks that are
+    matched in a process pool (or inline when `workers` is 1). Only the regex call
+    itself is timed: `match_seconds` sums those timings over all workers and
+    `throughput_mb_s` is derived from it, so it is comparable across runs. Pool
+    startup, mmap and decoding are only reflected in `wall_seconds` and
+    `wall_throughput_mb_s`.
+    """
+    if mode not in MATCH_MODES:
+        raise ValueError(f"mode must be one of {', '.join(MATCH_MODES)}")
+    re.compile(pattern)  # Surface `re.error` before spawning workers.
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = max(1, workers)
+
+    chunks = _chunk_bounds(path, workers)
+    jobs = [(pattern, mode, path, start, end, top) for start, end in chunks]
+    started = time.perf_counter()
+    if workers <= 1 or len(jobs) <= 1:
+        workers = 1
+        results = [_profile_chunk(job) for job in jobs]
+    else:
+        workers = min(workers, len(jobs))
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_profile_chunk, jobs))
+    wall_seconds = time.perf_counter() - started
+
+    total = _ChunkResult()
+    slowest: List[Tuple[int, int, str]] = []
+    for result in results:
+        for nanos, local_line, text in result.slowest:
+            # Report 1-based line numbers across the whole file.
+            slowest.append((nanos, total.lines + local_line + 1, text))
+        total.lines += result.lines
+        total.nbytes += result.nbytes
+        total.matches += result.matches
+        total.match_nanos += result.match_nanos
+        for bucket, count in enumerate(result.histogram):
+            total.histogram[bucket] += count
+    slowest = heapq.nlargest(top, slowest)
+
+    match_seconds = total.match_nanos / 1e9
+    bounds: List[Optional[int]] = [*HISTOGRAM_BOUNDS_US, None]
+    return {
+        "pattern": pattern,
+        "corpus": path,
+        "mode": mode,
+        "workers": workers,
+        "lines": total.lines,
+        "bytes": total.nbytes,
+        "matches": total.matches,
+        "match_rate": total.matches / total.lines if total.lines else 0.0,
+        "match_seconds": match_seconds,
+        "throughput_mb_s": total.nbytes / 1e6 / match_seconds if match_seconds > 0 else 0.0,
+        "wall_seconds": wall_seconds,
+        "wall_throughput_mb_s": total.nbytes / 1e6 / wall_seconds if wall_seconds > 0 else 0.0,
+        "histogram": [
+            {"upper_us": bound, "count": count} for bound, count in zip(bounds, total.histogram)
+        ],
+        "slowest": [
+            {"line": line, "seconds": nanos / 1e9, "text": text} for nanos, line, text in slowest
+        ],
+        "warnings": [{"code": w.code, "message": w.message} for w in analyze_regex(pattern)],
+    }
+
+
+def _chunk_bounds(path: str, workers: int) -> List[Tuple[int, int]]:
+    size = os.path.getsize(path)
+    if size == 0:
+        return []
+    target = max(MIN_CHUNK_BYTES, size // (workers * 4) + 1)
+    bounds: List[Tuple[int, int]] = []
+    with open(path, "rb") as handle, mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        start = 0
+        while start < size:
+            newline = mm.find(b"\n", min(start + target, size) - 1)
+            end = size if newline == -1 else newline + 1
+            bounds.append((start, end))
+            start = end
+    return bounds
+
+
+def _profile_chunk(job: Tuple[str, str, str, int, int, int]) -> _ChunkResult:
+    pattern, mode, path, start, end, top = job
+    matcher = getattr(re.compile(pattern), mode)
+    clock = time.perf_counter_ns
+    bucket_limits = [bound * 1_000 for bound in HISTOGRAM_BOUNDS_US]
+    result = _ChunkResult(nbytes=end - start)
+    slowest: List[Tuple[int, int, str]] = []
+
+    with open(path, "rb") as handle, mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        pos = start
+        while pos < end:
+            newline = mm.find(b"\n", pos, end)
+            line_end = end if newline == -1 else newline
+            line = mm[pos:line_end].rstrip(b"\r").decode("utf-8", "replace")
+            pos = line_end + 1
+
+            before = clock()
+            matched = matcher(line) is not None
+            nanos = clock() - before
+
+            result.match_nanos += nanos
+            if matched:
+                result.matches += 1
+            result.histogram[bisect.bisect_left(bucket_limits, nanos)] += 1
+            if len(slowest) < top:
+                heapq.heappush(slowest, (nanos, result.lines, line[:MAX_LINE_PREVIEW]))
+            elif top > 0 and nanos > slowest[0][0]:
+                heapq.heapreplace(slowest, (nanos, result.lines, line[:MAX_LINE_PREVIEW]))
+            result.lines += 1
+
+    result.slowest = slowest
+    return result
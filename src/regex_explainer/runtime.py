@@ -0,0 +1,399 @@
+from __future__ import annotations
+
+import atexit
+import json
+import os
+import random
+import re
+import sys
+import tempfile
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .core import analyze_regex, canonicalize_regex, fingerprint_regex
+
+# Top-level `re` functions that take the pattern as their first argument, mapped to
+# the index of their positional `flags` argument among the remaining arguments.
+WRAPPED_FUNCTIONS = {
+    "compile": 0,
+    "match": 1,
+    "search": 1,
+    "fullmatch": 1,
+    "sub": 3,
+    "subn": 3,
+    "split": 2,
+    "findall": 1,
+    "finditer": 1,
+}
+
+DUMP_FORMAT_VERSION = 2
+
+# Letters used for flags in reports and fingerprints, as in `/pattern/flags`.
+FLAG_LETTERS = (
+    (re.ASCII, "a"),
+    (re.IGNORECASE, "i"),
+    (re.LOCALE, "L"),
+    (re.MULTILINE, "m"),
+    (re.DOTALL, "s"),
+    (re.VERBOSE, "x"),
+)
+
+# Stats are kept per (pattern text, explicit flags, "str" or "bytes").
+PatternKey = Tuple[str, int, str]
+
+# Warning codes that mark a pattern as risky in reports. Missing anchors are left
+# out: nearly every `re.search` pattern has them, so they would not rank anything.
+RISK_CODES = frozenset({"nested_quantifier", "greedy_dot", "greedy_wide_class"})
+
+
+@dataclass
+class PatternStats:
+    calls: Dict[str, int] = field(default_factory=dict)
+    sampled_calls: int = 0
+    compile_seconds: float = 0.0
+    match_seconds: float = 0.0
+    call_sites: Dict[str, int] = field(default_factory=dict)
+
+
+class Recorder:
+    """Collects `re` usage statistics and periodically dumps them as JSON.
+
+    Every call is counted, but only a random `sample_rate` fraction of calls is
+    timed and attributed to a call site, which keeps the per-call overhead low.
+    Unsampled calls are counted in per-thread dicts without locking; the lock only
+    guards sampled records, registration of new threads and snapshots.
+    """
+
+    def __init__(self, path: str, sample_rate: float = 0.01, dump_interval: float = 60.0):
+        if not 0.0 < sample_rate <= 1.0:
+            raise ValueError("sample_rate must be in (0, 1]")
+        self.path_template = path
+        self.sample_rate = sample_rate
+        self.dump_interval = dump_interval
+        self.started_at = time.time()
+        self._stats: Dict[PatternKey, PatternStats] = {}
+        self._lock = threading.Lock()
+        self._dump_lock = threading.Lock()
+        self._local = threading.local()
+        # Raw (function, pattern, flags) call counts, one dict per thread that made calls.
+        self._thread_counts: List[Dict[Tuple[str, Any, Any], int]] = []
+
+    @property
+    def path(self) -> str:
+        # Resolved on every dump so that forked workers get their own file.
+        return self.path_template.format(pid=os.getpid())
+
+    def reset_after_fork(self) -> None:
+        # The child must not re-report the parent's stats, and locks held by other
+        # parent threads at fork time would never be released.
+        self.started_at = time.time()
+        self._stats = {}
+        self._lock = threading.Lock()
+        self._dump_lock = threading.Lock()
+        self._local = threading.local()
+        self._thread_counts = []
+
+    def count(self, function: str, pattern: Any, flags: Any = 0) -> None:
+        # Only the owning thread writes to its dict, so no lock is needed here;
+        # `pattern` and `flags` are normalized by `_pattern_key` at snapshot time.
+        try:
+            counts = self._local.counts
+        except AttributeError:
+            counts = self._local.counts = {}
+            with self._lock:
+                self._thread_counts.append(counts)
+        key = (function, pattern, flags)
+        counts[key] = counts.get(key, 0) + 1
+
+    def record_sample(self, function: str, key: PatternKey, site: str, seconds: float) -> None:
+        with self._lock:
+            stats = self._stats.get(key)
+            if stats is None:
+                stats = self._stats[key] = PatternStats()
+            stats.calls[function] = stats.calls.get(function, 0) + 1
+            stats.sampled_calls += 1
+            if function == "compile":
+                stats.compile_seconds += seconds
+            else:
+                stats.match_seconds += seconds
+            stats.call_sites[site] = stats.call_sites.get(site, 0) + 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            entries: Dict[PatternKey, Dict[str, Any]] = {
+                key: {
+                    "pattern": key[0],
+                    "flags": key[1],
+                    "type": key[2],
+                    "calls": dict(stats.calls),
+                    "sampled_calls": stats.sampled_calls,
+                    "compile_seconds": stats.compile_seconds,
+                    "match_seconds": stats.match_seconds,
+                    "call_sites": dict(stats.call_sites),
+                }
+                for key, stats in self._stats.items()
+            }
+            # Copying a dict is atomic under the GIL, so owners may keep counting.
+            thread_counts = [dict(counts) for counts in self._thread_counts]
+        keys: Dict[Tuple[Any, Any], PatternKey] = {}
+        for counts in thread_counts:
+            for (function, raw_pattern, raw_flags), n in counts.items():
+                key = keys.get((raw_pattern, raw_flags))
+                if key is None:
+                    key = keys[raw_pattern, raw_flags] = _pattern_key(raw_pattern, raw_flags)
+                entry = entries.get(key)
+                if entry is None:
+                    entry = entries[key] = {
+                        "pattern": key[0],
+                        "flags": key[1],
+                        "type": key[2],
+                        "calls": {},
+                        "sampled_calls": 0,
+                        "compile_seconds": 0.0,
+                        "match_seconds": 0.0,
+                        "call_sites": {},
+                    }
+                entry["calls"][function] = entry["calls"].get(function, 0) + n
+        patterns = list(entries.values())
+        return {
+            "version": DUMP_FORMAT_VERSION,
+            "pid": os.getpid(),
+            "started_at": self.started_at,
+            "dumped_at": time.time(),
+            "sample_rate": self.sample_rate,
+            "patterns": patterns,
+        }
+
+    def dump(self) -> None:
+        # Write to a unique temp file first so readers never see a half-written dump,
+        # and serialize dumps so the periodic thread and atexit/uninstall don't race.
+        with self._dump_lock:
+            path = self.path
+            fd, tmp_path = tempfile.mkstemp(
+                dir=os.path.dirname(path) or ".", prefix=f".{os.path.basename(path)}."
+            )
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as handle:
+                    json.dump(self.snapshot(), handle, sort_keys=True)
+                os.replace(tmp_path, path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+
+
+# Bound before `install()` patches `re`, so normalizing keys is never itself recorded.
+_compile = re.compile
+
+_recorder: Optional[Recorder] = None
+_originals: Dict[str, Callable[..., Any]] = {}
+_stop_dumping: Optional[threading.Event] = None
+_dump_thread: Optional[threading.Thread] = None
+
+
+def install(path: str, sample_rate: float = 0.01, dump_interval: float = 60.0) -> Recorder:
+    """Start recording `re` usage process-wide.
+
+    `path` may contain `{pid}`; it is filled in at every dump, so workers forked
+    after `install()` (e.g. by a prefork server) each write their own file and
+    start with empty stats. Without `{pid}`, forked workers overwrite each other.
+    Methods on compiled pattern objects (`pattern.search(...)`) cannot be patched,
+    so they are neither counted nor timed; only the `re.compile` call itself is seen.
+    Report rows flag such patterns as `precompiled`.
+    """
+    global _recorder
+    if _recorder is not None:
+        raise RuntimeError("runtime profiling is already installed")
+
+    recorder = Recorder(path, sample_rate=sample_rate, dump_interval=dump_interval)
+    _recorder = recorder
+    for name in WRAPPED_FUNCTIONS:
+        original = getattr(re, name)
+        _originals[name] = original
+        setattr(re, name, _wrap(name, original, recorder))
+
+    _start_dump_thread(recorder)
+    atexit.register(recorder.dump)
+    return recorder
+
+
+def uninstall() -> None:
+    """Restore the original `re` functions and write a final dump."""
+    global _recorder, _stop_dumping, _dump_thread
+    recorder = _recorder
+    if recorder is None:
+        return
+    for name, original in _originals.items():
+        setattr(re, name, original)
+    _originals.clear()
+    if _stop_dumping is not None:
+        _stop_dumping.set()
+    if _dump_thread is not None:
+        _dump_thread.join()
+    atexit.unregister(recorder.dump)
+    _recorder = None
+    _stop_dumping = None
+    _dump_thread = None
+    recorder.dump()
+
+
+def load_dumps(paths: List[str]) -> Dict[PatternKey, Dict[str, Any]]:
+    """Merge one or more dump files into totals per (pattern, flags, type).
+
+    Entries from version 1 dumps, which had no flags or type, count as `str`
+    patterns without flags.
+    """
+    merged: Dict[PatternKey, Dict[str, Any]] = {}
+    for path in paths:
+        with open(path, encoding="utf-8") as handle:
+            data = json.load(handle)
+        for entry in data.get("patterns", []):
+            target = merged.setdefault(
+                (entry["pattern"], entry.get("flags", 0), entry.get("type", "str")),
+                {
+                    "calls": {},
+                    "sampled_calls": 0,
+                    "compile_seconds": 0.0,
+                    "match_seconds": 0.0,
+                    "call_sites": {},
+                },
+            )
+            for function, count in entry.get("calls", {}).items():
+                target["calls"][function] = target["calls"].get(function, 0) + count
+            for site, count in entry.get("call_sites", {}).items():
+                target["call_sites"][site] = target["call_sites"].get(site, 0) + count
+            target["sampled_calls"] += entry.get("sampled_calls", 0)
+            target["compile_seconds"] += entry.get("compile_seconds", 0.0)
+            target["match_seconds"] += entry.get("match_seconds", 0.0)
+    return merged
+
+
+def build_report(paths: List[str]) -> List[Dict[str, Any]]:
+    """Join recorded usage with static warnings, ordered so risky hot spots come first.
+
+    Patterns with a `RISK_CODES` warning rank above the rest; within each tier rows
+    are ordered by estimated time, then by call count.
+
+    Sampled timings are scaled up by each pattern's calls/sampled_calls ratio to
+    estimate total time spent. For `precompiled` rows (seen by `re.compile`), calls
+    made through the compiled object are missing, so calls and time are lower
+    bounds. Warnings come from the recorded pattern itself, so
+    they match `regex-explainer PATTERN`; the canonical form and fingerprint are
+    reported for grouping variants.
+    """
+    rows: List[Dict[str, Any]] = []
+    for (pattern, flags, pattern_type), totals in load_dumps(paths).items():
+        total_calls = sum(totals["calls"].values())
+        sampled = totals["sampled_calls"]
+        scale = total_calls / sampled if sampled else 0.0
+        letters = _flag_letters(flags)
+        canonical = canonicalize_regex(pattern, letters)
+        fingerprint = fingerprint_regex(pattern, letters)
+        warnings = analyze_regex(pattern)
+        top_sites = sorted(totals["call_sites"].items(), key=lambda item: (-item[1], item[0]))
+        rows.append(
+            {
+                "pattern": pattern,
+                "flags": letters,
+                "type": pattern_type,
+                "canonical": canonical,
+                "fingerprint": fingerprint,
+                "total_calls": total_calls,
+                "calls": totals["calls"],
+                "sampled_calls": sampled,
+                "estimated_compile_seconds": totals["compile_seconds"] * scale,
+                "estimated_match_seconds": totals["match_seconds"] * scale,
+                "call_sites": [{"site": site, "sampled_calls": n} for site, n in top_sites],
+                "precompiled": totals["calls"].get("compile", 0) > 0,
+                "risky": any(w.code in RISK_CODES for w in warnings),
+                "warnings": [{"code": w.code, "message": w.message} for w in warnings],
+            }
+        )
+    rows.sort(
+        key=lambda row: (
+            row["risky"],
+            row["estimated_compile_seconds"] + row["estimated_match_seconds"],
+            row["total_calls"],
+        ),
+        reverse=True,
+    )
+    return rows
+
+
+def _start_dump_thread(recorder: Recorder) -> None:
+    global _stop_dumping, _dump_thread
+    _stop_dumping = threading.Event()
+    _dump_thread = None
+    if recorder.dump_interval > 0:
+        _dump_thread = threading.Thread(
+            target=_dump_periodically,
+            args=(recorder, _stop_dumping),
+            name="regex-explainer-dump",
+            daemon=True,
+        )
+        _dump_thread.start()
+
+
+def _dump_periodically(recorder: Recorder, stop: threading.Event) -> None:
+    while not stop.wait(recorder.dump_interval):
+        recorder.dump()
+
+
+def _after_fork_in_child() -> None:
+    # Threads do not survive fork, so the child needs its own dump thread.
+    if _recorder is not None:
+        _recorder.reset_after_fork()
+        _start_dump_thread(_recorder)
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
+
+
+def _pattern_key(pattern: Any, flags: Any = 0) -> PatternKey:
+    # Keep only the flags the caller passed: a compiled pattern's `.flags` also holds
+    # inline `(?i)` flags and the implicit `re.UNICODE` of `str` patterns.
+    flags = int(flags) if isinstance(flags, int) else 0
+    if isinstance(pattern, re.Pattern):
+        try:
+            implied = _compile(pattern.pattern).flags
+        except re.error:
+            implied = 0
+        flags = pattern.flags & ~implied
+        pattern = pattern.pattern
+    flags = int(flags) & ~re.UNICODE
+    if isinstance(pattern, bytes):
+        return pattern.decode("ascii", "backslashreplace"), flags, "bytes"
+    return str(pattern), flags, "str"
+
+
+def _flag_letters(flags: int) -> str:
+    return "".join(letter for flag, letter in FLAG_LETTERS if flags & flag)
+
+
+def _wrap(name: str, original: Callable[..., Any], recorder: Recorder) -> Callable[..., Any]:
+    sample_rate = recorder.sample_rate
+    flags_index = WRAPPED_FUNCTIONS[name]
+    rand = random.random
+    clock = time.perf_counter
+
+    def wrapper(pattern: Any, *args: Any, **kwargs: Any) -> Any:
+        flags = args[flags_index] if len(args) > flags_index else kwargs.get("flags", 0)
+        if rand() >= sample_rate:
+            recorder.count(name, pattern, flags)
+            return original(pattern, *args, **kwargs)
+        # Lazy results (e.g. `finditer`) are only timed up to their creation.
+        start = clock()
+        try:
+            return original(pattern, *args, **kwargs)
+        finally:
+            elapsed = clock() - start
+            caller = sys._getframe(1)
+            site = f"{caller.f_code.co_filename}:{caller.f_lineno}"
+            recorder.record_sample(name, _pattern_key(pattern, flags), site, elapsed)
+
+    wrapper.__name__ = getattr(original, "__name__", name)
+    wrapper.__doc__ = original.__doc__
+    wrapper.__wrapped__ = original  # type: ignore[attr-defined]
+    return wrapper
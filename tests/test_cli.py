@@ -3,6 +3,7 @@ from __future__ import annotations
 import json
 import subprocess
 import sys
+from pathlib import Path
 
 
 def _run_cli(args: list[str], stdin: str | None = None) -> subprocess.CompletedProcess[str]:
@@ -23,6 +24,17 @@ def test_cli_parses_js_literal_flags_into_output():
     assert payload["flags"] == "im"
 
 
+def test_cli_json_includes_canonical_form_and_fingerprint():
+    proc = _run_cli([r"(?:a)[0-9]", "--format=json"])
+    assert proc.returncode == 0, proc.stderr
+    payload = json.loads(proc.stdout)
+    assert payload["canonical"] == r"a\d"
+    assert len(payload["fingerprint"]) == 16
+    flagged = json.loads(_run_cli([r"/(?:a)[0-9]/i", "--format=json"]).stdout)
+    assert flagged["canonical"] == payload["canonical"]
+    assert flagged["fingerprint"] != payload["fingerprint"]
+
+
 def test_cli_stdin_pattern():
     proc = _run_cli(["-", "--format=json"], stdin=r"^hello.*world$")
     assert proc.returncode == 0, proc.stderr
@@ -42,6 +54,18 @@ def test_cli_fail_on_warn_nonzero_exit():
     assert proc.returncode == 2
 
 
+def test_cli_fail_fast_reports_single_warning():
+    proc = _run_cli(["hello.*world", "--warnings", "--fail-fast", "--format=json"])
+    assert proc.returncode == 2
+    assert len(json.loads(proc.stdout)["warnings"]) == 1
+
+
+def test_cli_unknown_rule_is_an_error():
+    proc = _run_cli(["hello", "--skip-rules", "no_such_rule"])
+    assert proc.returncode == 2
+    assert "unknown rule" in proc.stderr
+
+
 def test_cli_quiet_suppresses_headings():
     proc = _run_cli([r"^ab$", "--quiet"])
     assert proc.returncode == 0, proc.stderr
@@ -61,3 +85,56 @@ def test_cli_version_flag():
     proc = _run_cli(["--version"])
     assert proc.returncode == 0, proc.stderr
     assert proc.stdout.strip().startswith("regex-explainer ")
+
+
+def test_cli_double_dash_explains_pattern_named_like_subcommand():
+    proc = _run_cli(["--format=json", "--", "report"])
+    assert proc.returncode == 0, proc.stderr
+    assert json.loads(proc.stdout)["pattern"] == "report"
+    proc = _run_cli(["--", "profile"])
+    assert proc.returncode == 0, proc.stderr
+    assert "- Literal 'p'" in proc.stdout
+
+
+def _write_dump(tmp_path: Path, *entries: dict[str, object]) -> str:
+    path = tmp_path / "dump.json"
+    path.write_text(json.dumps({"version": 2, "sample_rate": 1.0, "patterns": list(entries)}))
+    return str(path)
+
+
+def test_cli_report_subcommand_json(tmp_path):
+    path = _write_dump(
+        tmp_path,
+        {
+            "pattern": "hello.*world",
+            "calls": {"match": 3},
+            "sampled_calls": 3,
+            "compile_seconds": 0.0,
+            "match_seconds": 0.003,
+            "call_sites": {"app.py:1": 3},
+        },
+    )
+    proc = _run_cli(["report", path, "--format=json"])
+    assert proc.returncode == 0, proc.stderr
+    payload = json.loads(proc.stdout)
+    assert payload["patterns"][0]["pattern"] == "hello.*world"
+    assert "greedy_dot" in {w["code"] for w in payload["patterns"][0]["warnings"]}
+
+
+def test_cli_profile_subcommand_json(tmp_path):
+    path = tmp_path / "corpus.log"
+    path.write_text("hello world\nhello there\nbye\n")
+    proc = _run_cli(["profile", "^hello", "--corpus", str(path), "--workers=1"])
+    assert proc.returncode == 0, proc.stderr
+    payload = json.loads(proc.stdout)
+    assert payload["lines"] == 3
+    assert payload["matches"] == 2
+    assert "missing_end_anchor" in {w["code"] for w in payload["warnings"]}
+
+
+def test_cli_profile_rejects_zero_workers(tmp_path):
+    path = tmp_path / "corpus.log"
+    path.write_text("hello\n")
+    proc = _run_cli(["profile", "^hello", "--corpus", str(path), "--workers=0"])
+    assert proc.returncode == 2
+    assert "--workers" in proc.stderr
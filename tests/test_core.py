@@ -1,4 +1,13 @@
-from regex_explainer.core import analyze_regex, explain_regex, tokenize
+import re
+
+from regex_explainer.core import (
+    analyze_regex,
+    canonicalize_regex,
+    explain_regex,
+    fingerprint_regex,
+    rule_names,
+    tokenize,
+)
 
 
 def test_tokenize_simple():
@@ -54,3 +63,75 @@ def test_warnings_nested_quantifier():
     warnings = analyze_regex(r"^(.+)+$")
     codes = {w.code for w in warnings}
     assert "nested_quantifier" in codes
+
+
+def test_warnings_rule_selection():
+    assert "wildcards" in rule_names()
+    codes = {w.code for w in analyze_regex("hello.*world", rules=["wildcards"])}
+    assert codes == {"greedy_dot"}
+    codes = {w.code for w in analyze_regex("hello.*world", skip_rules=["start_anchor"])}
+    assert codes == {"missing_end_anchor", "greedy_dot"}
+
+
+def test_warnings_fail_fast_stops_at_first_warning():
+    warnings = analyze_regex(r"^(a+)+.*", fail_fast=True)
+    assert [w.code for w in warnings] == ["missing_end_anchor"]
+
+
+def test_canonicalize_cosmetic_variants_share_fingerprint():
+    variants = [r"(?mi)^(?:foo)[0-9]+$", r"(?im)^foo\d+$", r"(?im)^(?:f)oo[0-9]+$"]
+    assert canonicalize_regex(variants[0]) == r"(?im)^foo\d+$"
+    assert len({fingerprint_regex(v) for v in variants}) == 1
+
+
+def test_fingerprint_includes_normalized_flags():
+    assert fingerprint_regex("abc", "i") != fingerprint_regex("abc")
+    assert fingerprint_regex("abc", "mi") == fingerprint_regex("abc", "im")
+    assert canonicalize_regex("a(?: )+", "x") == "a(?: )+"
+
+
+def test_canonicalize_sorts_class_members_and_keeps_meaningful_groups():
+    assert canonicalize_regex(r"[cba-]") == r"[\-abc]"
+    assert canonicalize_regex(r"[^A-Za-z0-9_]") == r"\W"
+    assert canonicalize_regex(r"(?:a)+(?:ab)+(?:a|b)") == r"a+(?:ab)+(?:a|b)"
+    assert canonicalize_regex(r"(?<word>\w+)") == r"(?P<word>\w+)"
+
+
+def test_canonical_form_keeps_wide_class_warning():
+    for pattern in (r"^[\s\S]*$", r"^[\S\s]*$", r"^[\W\w]+$"):
+        codes = {w.code for w in analyze_regex(canonicalize_regex(pattern))}
+        assert codes == {"greedy_wide_class"}
+
+
+def test_canonical_classes_match_the_same_text_as_the_original():
+    text = "".join(map(chr, range(256)))
+    classes = [
+        r"[\t-\r]",
+        r"[\--/]",
+        r"[\.-9]",
+        r"[\]-a]",
+        r"[^\t-\r]",
+        r"[cba-]",
+        r"[a^-z]",
+        r"[a-c-e]",
+        r"[\\-a]",
+        r"[x\.y]",
+    ]
+    for pattern in classes:
+        canonical = canonicalize_regex(pattern)
+        assert re.findall(canonical, text) == re.findall(pattern, text), (pattern, canonical)
+
+
+def test_canonicalize_leaves_verbose_patterns_alone():
+    for pattern in (r"(?x)a(?: )+", r"(?ix:a (?:b))"):
+        assert canonicalize_regex(pattern) == pattern
+
+
+def test_canonicalize_does_not_create_backreference():
+    assert canonicalize_regex(r"(a)\1(?:0)") == r"(a)\1(?:0)"
+    assert canonicalize_regex(r"(a)(?:\1)0") == r"(a)\1(?:0)"
+    assert canonicalize_regex(r"(a)\1(?:)0") == r"(a)\1(?:0)"
+    assert canonicalize_regex(r"\01(?:2)") == r"\01(?:2)"
+    assert canonicalize_regex(r"(?:\01)2") == r"\01(?:2)"
+    assert canonicalize_regex(r"(a)\\(?:1)") == r"(a)\\1"
+    assert fingerprint_regex("^a$") != fingerprint_regex("^b$")
@@ -0,0 +1,41 @@
+from regex_explainer import corpus
+
+
+def _write_corpus(tmp_path):
+    path = tmp_path / "sample.log"
+    lines = [f"id={i} status={'ok' if i % 4 else 'error'}" for i in range(40)]
+    path.write_text("\r\n".join(lines) + "\n")
+    return path
+
+
+def test_profile_corpus_counts_lines_and_matches(tmp_path):
+    path = _write_corpus(tmp_path)
+    result = corpus.profile_corpus(r"status=error$", str(path), workers=1, top=3)
+    assert result["lines"] == 40
+    assert result["matches"] == 10
+    assert result["match_rate"] == 0.25
+    assert result["bytes"] == path.stat().st_size
+    assert sum(bucket["count"] for bucket in result["histogram"]) == 40
+    assert 0 < result["match_seconds"] <= result["wall_seconds"]
+    assert result["throughput_mb_s"] >= result["wall_throughput_mb_s"]
+    assert len(result["slowest"]) == 3
+    assert "missing_start_anchor" in {w["code"] for w in result["warnings"]}
+
+
+def test_profile_corpus_numbers_lines_across_worker_chunks(tmp_path, monkeypatch):
+    monkeypatch.setattr(corpus, "MIN_CHUNK_BYTES", 64)
+    path = _write_corpus(tmp_path)
+    result = corpus.profile_corpus(r"^id=39 ", str(path), mode="match", workers=2, top=40)
+    assert result["workers"] == 2
+    assert result["lines"] == 40
+    assert result["matches"] == 1
+    by_line = {slow["line"]: slow["text"] for slow in result["slowest"]}
+    assert sorted(by_line) == list(range(1, 41))
+    assert by_line[40] == "id=39 status=ok"
+
+
+def test_profile_corpus_clamps_non_positive_workers(tmp_path):
+    path = _write_corpus(tmp_path)
+    result = corpus.profile_corpus(r"status=error$", str(path), workers=0)
+    assert result["workers"] == 1
+    assert result["matches"] == 10
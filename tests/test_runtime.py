@@ -0,0 +1,173 @@
+import json
+import os
+import re
+import threading
+
+import pytest
+
+from regex_explainer import runtime
+from regex_explainer.core import analyze_regex
+
+
+def _write_dump(tmp_path, *entries):
+    """Write a dump file whose pattern entries default to one sampled `search` call."""
+    defaults = {
+        "calls": {"search": 1},
+        "sampled_calls": 1,
+        "compile_seconds": 0.0,
+        "match_seconds": 0.001,
+        "call_sites": {},
+    }
+    dump = {
+        "version": runtime.DUMP_FORMAT_VERSION,
+        "sample_rate": 1.0,
+        "patterns": [{**defaults, **entry} for entry in entries],
+    }
+    path = tmp_path / "dump.json"
+    path.write_text(json.dumps(dump))
+    return str(path)
+
+
+def test_install_records_calls_and_uninstall_restores(tmp_path):
+    path = tmp_path / "re-usage.json"
+    original_match = re.match
+    runtime.install(str(path), sample_rate=1.0, dump_interval=0)
+    try:
+        re.match(r"hello.*world", "hello big world")
+        re.compile(r"^ab$")
+        re.search(re.compile(r"^ab$"), "ab")
+    finally:
+        runtime.uninstall()
+
+    assert re.match is original_match
+    data = json.loads(path.read_text())
+    entries = {entry["pattern"]: entry for entry in data["patterns"]}
+    assert entries["hello.*world"]["calls"] == {"match": 1}
+    assert entries["^ab$"]["calls"] == {"compile": 2, "search": 1}
+    assert entries["^ab$"]["sampled_calls"] == 3
+    site = next(iter(entries["hello.*world"]["call_sites"]))
+    assert site.startswith(__file__)
+
+    rows = {row["pattern"]: row for row in runtime.build_report([str(path)])}
+    assert rows["^ab$"]["precompiled"]
+    assert not rows["hello.*world"]["precompiled"]
+
+
+def test_patterns_are_keyed_by_flags_and_type(tmp_path):
+    path = tmp_path / "re-usage.json"
+    recorder = runtime.install(str(path), sample_rate=1.0, dump_interval=0)
+    try:
+        re.compile("abc")
+        re.compile("abc", re.I)
+        re.search("abc", "ABC", flags=re.IGNORECASE)
+        re.search(re.compile("abc", re.I), "ABC")
+        re.compile(b"abc")
+        recorder.count("match", re.compile("(?i)abc"))
+    finally:
+        runtime.uninstall()
+
+    rows = runtime.build_report([str(path)])
+    calls = {(row["pattern"], row["flags"], row["type"]): row["total_calls"] for row in rows}
+    assert calls == {
+        ("abc", "", "str"): 1,
+        ("abc", "i", "str"): 4,
+        ("abc", "", "bytes"): 1,
+        ("(?i)abc", "", "str"): 2,
+    }
+    fingerprints = {(row["pattern"], row["flags"]): row["fingerprint"] for row in rows}
+    assert fingerprints["abc", "i"] != fingerprints["abc", ""]
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="requires os.fork")
+def test_forked_child_writes_its_own_dump_without_parent_stats(tmp_path):
+    template = str(tmp_path / "ru-{pid}.json")
+    runtime.install(template, sample_rate=1.0, dump_interval=3600)
+    try:
+        re.match("parent", "parent")
+        pid = os.fork()
+        if pid == 0:
+            status = 1
+            try:
+                re.match("child", "child")
+                thread = runtime._dump_thread
+                runtime.uninstall()
+                status = 0 if thread is not None and not thread.is_alive() else 1
+            finally:
+                os._exit(status)
+        _, status = os.waitpid(pid, 0)
+        assert os.waitstatus_to_exitcode(status) == 0
+    finally:
+        runtime.uninstall()
+
+    child = json.loads((tmp_path / f"ru-{pid}.json").read_text())
+    parent = json.loads((tmp_path / f"ru-{os.getpid()}.json").read_text())
+    assert [entry["pattern"] for entry in child["patterns"]] == ["child"]
+    assert [entry["pattern"] for entry in parent["patterns"]] == ["parent"]
+
+
+def test_concurrent_dumps_do_not_collide(tmp_path):
+    recorder = runtime.Recorder(str(tmp_path / "dump.json"), sample_rate=1.0)
+    recorder.count("match", "^a$")
+    threads = [threading.Thread(target=recorder.dump) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert [p.name for p in tmp_path.iterdir()] == ["dump.json"]
+    assert json.loads((tmp_path / "dump.json").read_text())["patterns"][0]["pattern"] == "^a$"
+
+
+def test_unsampled_counts_from_all_threads_are_merged(tmp_path):
+    recorder = runtime.Recorder(str(tmp_path / "dump.json"), sample_rate=1.0)
+
+    def work():
+        for _ in range(1000):
+            recorder.count("search", "a+")
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    recorder.record_sample("search", ("a+", 0, "str"), "app.py:1", 0.5)
+
+    entries = {entry["pattern"]: entry for entry in recorder.snapshot()["patterns"]}
+    assert entries["a+"]["calls"] == {"search": 4001}
+    assert entries["a+"]["sampled_calls"] == 1
+    assert entries["a+"]["call_sites"] == {"app.py:1": 1}
+
+
+def test_build_report_ranks_risky_patterns_first(tmp_path):
+    path = _write_dump(
+        tmp_path,
+        {"pattern": "^ab$", "calls": {"match": 100}, "sampled_calls": 50, "match_seconds": 1.0},
+        {
+            "pattern": "status=ok",
+            "calls": {"search": 100},
+            "sampled_calls": 50,
+            "match_seconds": 0.5,
+        },
+        {"pattern": "^(a+)+$", "calls": {"match": 10}, "sampled_calls": 5, "match_seconds": 0.1},
+    )
+    rows = runtime.build_report([path, path])
+    # Missing anchors alone do not make "status=ok" outrank the faster-but-hotter "^ab$".
+    assert [row["pattern"] for row in rows] == ["^(a+)+$", "^ab$", "status=ok"]
+    assert [row["risky"] for row in rows] == [True, False, False]
+    assert rows[0]["total_calls"] == 20
+    assert rows[1]["estimated_match_seconds"] == 4.0
+    assert {w["code"] for w in rows[0]["warnings"]} == {"nested_quantifier"}
+
+
+def test_build_report_keeps_wide_class_warning(tmp_path):
+    path = _write_dump(tmp_path, {"pattern": r"^[\s\S]*$"})
+    (row,) = runtime.build_report([path])
+    assert row["canonical"] == r"^[\S\s]*$"
+    assert [w["code"] for w in row["warnings"]] == ["greedy_wide_class"]
+    assert row["risky"]
+
+
+def test_build_report_warnings_match_analysis_of_recorded_pattern(tmp_path):
+    path = _write_dump(tmp_path, {"pattern": "(?:^abc$)"}, {"pattern": "^(?:.)*x$"})
+    for row in runtime.build_report([path]):
+        expected = [w.code for w in analyze_regex(row["pattern"])]
+        assert [w["code"] for w in row["warnings"]] == expected